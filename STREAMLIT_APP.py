@@ -1,5 +1,4 @@
-import streamlit as st, tempfile, os
-from PIL import Image
+import streamlit as st, os, cv2, numpy as np
 from utils.cv_pipeline import run_hand_analysis
 
 # ───────────── Color-badge helper ─────────────
@@ -11,6 +10,24 @@ def action_badge(action: str) -> str:
             f"color:white;padding:6px 12px;border-radius:6px;"
             f"font-weight:600;font-size:1.2rem;'>{action.upper()}</span>")
 
+# ───────────── Cached analysis ─────────────
+# Keyed on the raw upload bytes + inputs, so re-clicking Analyze on the
+# same board skips YOLO/ResNet entirely. Bounded so input tweaks don't
+# pile up entries in server memory.
+@st.cache_data(show_spinner=False, max_entries=32, ttl=3600)
+def analyze(image_bytes: bytes, hole_input: str, num_players: int,
+            call_amt: float, pot_before: float) -> dict:
+    bgr = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_COLOR)
+    if bgr is None:
+        raise ValueError("Could not decode the uploaded image.")
+    return run_hand_analysis(
+        image       = bgr,
+        hole_input  = hole_input,
+        num_players = num_players,
+        call_amt    = call_amt,
+        pot_before  = pot_before
+    )
+
 # ───────────── Basic CSS ─────────────
 st.markdown("""
 <style>
@@ -44,28 +61,20 @@ with st.sidebar:
 
 # ───────────── Main logic ─────────────
 if go and uploaded and hole_txt:
-    tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".jpg")
-    tmp.write(uploaded.read()); tmp.close()
+    image_bytes = uploaded.getvalue()
 
     with st.spinner("Analyzing hand..."):
         try:
-            res = run_hand_analysis(
-                image_path  = tmp.name,
-                hole_input  = hole_txt,
-                num_players = players,
-                call_amt    = call_amt,
-                pot_before  = pot_size
-            )
+            res = analyze(image_bytes, hole_txt, players, call_amt, pot_size)
         except ValueError as e:
             st.error(str(e))
-            os.remove(tmp.name)
             st.stop()
 
     # --- layout: big image left, results right
     left, right = st.columns([2, 1])
 
     with left:
-        st.image(Image.open(tmp.name), caption="Uploaded board",
+        st.image(image_bytes, caption="Uploaded board",
                  use_container_width=True)
 
     with right:
@@ -131,7 +140,5 @@ if go and uploaded and hole_txt:
 * **Board texture:** {texture_str}
 """, unsafe_allow_html=True)
 
-    os.remove(tmp.name)
-
 elif go:
     st.warning("Please upload a board image **and** enter your hole cards.")
@@ -5,36 +5,62 @@ Computer-vision + poker pipeline:
   • run_hand_analysis() ties everything together
 """
 
-import os, torch, numpy as np
+import cv2, torch, numpy as np
+import streamlit as st
 from pathlib import Path
 from PIL import Image
 from ultralytics import YOLO
-from torchvision import datasets, models, transforms
-from IPython import display
+from torchvision import models
+from torchvision.transforms.v2 import functional as TF
 
 from utils.poker_logic import (convert_to_treys_format, decide_action,
-                               DecisionConfiguration)
-from treys import Card, Evaluator
+                               evaluate_hand, DecisionConfiguration)
 
 # ------------------------------------------------------------
-# 1. Load models once (global singletons)
+# 1. Load models once (cached singletons)
 # ------------------------------------------------------------
-
-DETECTOR = YOLO("models/fromthetrash_best.pt") # mAP50: 0.974
-# DETECTOR = YOLO("models/best.pt") # mAP50: 0.946
-# DETECTOR = YOLO("runs/runs2/detect/train/weights/best.pt") # mAP50: 0.974
-
-_CLASSIFIER = models.resnet18()
-_CLASSIFIER.fc = torch.nn.Linear(_CLASSIFIER.fc.in_features, 53)
-_CLASSIFIER.load_state_dict(torch.load("models/card_classifier.pt",
-                                      map_location="cpu"))
-_CLASSIFIER.eval()
-
-_TFM = transforms.Compose([
-    transforms.Resize(128),
-    transforms.CenterCrop(128),
-    transforms.ToTensor()
-])
+# st.cache_resource keeps one instance per server process, so Streamlit
+# reruns don't re-read the weights from disk.
+
+_DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
+# FP16 only pays off on GPU tensor cores; CPU stays in FP32.
+_DTYPE  = torch.float16 if _DEVICE == "cuda" else torch.float32
+
+_DETECTOR_WEIGHTS = Path("models/fromthetrash_best.pt") # mAP50: 0.974
+# Path("models/best.pt") # mAP50: 0.946
+# Path("runs/runs2/detect/train/weights/best.pt") # mAP50: 0.974
+
+@st.cache_resource
+def get_detector():
+    # On CPU prefer an ONNX export next to the weights (ONNX Runtime is
+    # ~2-4x faster than the PyTorch backend there); see README to export.
+    onnx = _DETECTOR_WEIGHTS.with_suffix(".onnx")
+    if _DEVICE == "cpu" and onnx.exists():
+        return YOLO(str(onnx), task="detect")
+    return YOLO(str(_DETECTOR_WEIGHTS))
+
+@st.cache_resource
+def get_classifier():
+    clf = models.resnet18()
+    clf.fc = torch.nn.Linear(clf.fc.in_features, 53)
+    clf.load_state_dict(torch.load("models/card_classifier.pt",
+                                   map_location="cpu"))
+    clf = clf.eval().to(_DEVICE, _DTYPE)
+    # Trace at the usual batch (≤5 board cards) and freeze: folds BN into
+    # the convs and drops per-layer Python dispatch. Batch size stays free.
+    example = torch.zeros(5, 3, 128, 128, device=_DEVICE, dtype=_DTYPE)
+    with torch.no_grad():
+        return torch.jit.freeze(torch.jit.trace(clf, example))
+
+def _preprocess_crop(crop:torch.Tensor) -> torch.Tensor:
+    """
+    Tensor version of the training transform
+    (Resize(128) → CenterCrop(128) → ToTensor) for a uint8 CHW crop,
+    run on whatever device the crop lives on.
+    """
+    crop = crop.float().div_(255)
+    crop = TF.resize(crop, [128], antialias=True)
+    return TF.center_crop(crop, [128])
 
 '''_CLASS_LABELS = datasets.ImageFolder(
     "data/kaggle_individual_cards/train"
@@ -61,48 +87,71 @@ _CLASS_LABELS = [
 # ------------------------------------------------------------
 # 2. Card detection + classification
 # ------------------------------------------------------------
-def predict_cards(image_path:str, show=False):
+def _as_bgr(image) -> np.ndarray:
+    """
+    Normalise the pipeline input to an HxWx3 uint8 BGR array
+    (OpenCV / Ultralytics convention). Accepts a BGR ndarray,
+    a PIL.Image, or a file path.
+    """
+    if isinstance(image, np.ndarray):
+        return image
+    if isinstance(image, Image.Image):
+        return np.ascontiguousarray(np.asarray(image.convert("RGB"))[:, :, ::-1])
+    bgr = cv2.imread(str(image), cv2.IMREAD_COLOR)
+    if bgr is None:
+        raise ValueError(f"Could not read image: {image}")
+    return bgr
+
+def predict_cards(image, show=False):
     """
-    Runs YOLOv8 community-card detector and ResNet classifier.
+    Runs YOLOv8 community-card detector and ResNet classifier on a
+    BGR ndarray / PIL.Image / path.
     Returns list of human-readable labels e.g. ['ten of hearts', ...]
     """
-    results = DETECTOR(image_path, save = True, conf=0.7)
-    boxes = results[0].boxes.xyxy.cpu().numpy()
+    bgr = _as_bgr(image)
+    H, W = bgr.shape[:2]
+
+    # Shrink large photos to the detector's 640 input once with OpenCV,
+    # rather than letting Ultralytics letterbox the full-size frame.
+    scale = 640 / max(H, W)
+    if scale < 1:
+        det_in = cv2.resize(bgr, (round(W*scale), round(H*scale)),
+                            interpolation=cv2.INTER_LINEAR)
+    else:
+        det_in, scale = bgr, 1.0
+
+    results = get_detector()(det_in, conf=0.7, imgsz=640, save=False, verbose=False,
+                             device=0 if _DEVICE == "cuda" else "cpu",
+                             half=_DTYPE == torch.float16)
+    boxes = results[0].boxes.xyxy.cpu().numpy() / scale   # back to full-res coords
     confs = results[0].boxes.conf.cpu().numpy()
-    H = results[0].orig_shape[0]
 
     # Sort boxes by confidence
     order = confs.argsort()[::-1]
     boxes = boxes[order]
-    confs = confs[order]
     #row_tol = 0.12*H
     row_tol = 0.05*H
-    kept=[]
-    base_y=None
-    for b in boxes:
-        x1,y1,x2,y2=b 
-        yc=(y1+y2)/2
-        if base_y is None or abs(yc-base_y)<row_tol:
-            base_y = yc if base_y is None else base_y
-            kept.append([int(x1), int(y1), int(x2), int(y2)])
-        if len(kept)==5: 
-            break
-
-    # classify
-    img = Image.open(image_path).convert("RGB")
-    card_preds = []
-    for x1, y1, x2, y2 in kept:
-        crop = img.crop((x1, y1, x2, y2))
-        tensor = _TFM(crop).unsqueeze(0)          # 128-resize → tensor
-        with torch.no_grad():
-            out = _CLASSIFIER(tensor)
-            idx = out.argmax(dim=1).item()
-            label = _CLASS_LABELS[idx]
-            if label != "joker":                  # ignore jokers
-                card_preds.append(label)
-
-    if show:
-        display(img.resize((400, None)))
+    # keep up to 5 boxes on the same row as the most confident one
+    yc = (boxes[:, 1] + boxes[:, 3]) * 0.5
+    in_row = np.abs(yc - yc[0]) < row_tol if len(yc) else np.zeros(0, bool)
+    kept = boxes[in_row][:5].astype(np.int32).tolist()
+
+    # classify (all crops in one batch, preprocessed on the model's device)
+    rgb = np.ascontiguousarray(bgr[:, :, ::-1])
+    img = torch.from_numpy(rgb).permute(2, 0, 1).to(_DEVICE)   # uint8 CHW
+    if not kept:
+        card_preds = []
+    else:
+        batch = torch.stack([_preprocess_crop(img[:, y1:y2, x1:x2])
+                             for x1, y1, x2, y2 in kept]).to(_DTYPE)
+        with torch.inference_mode():
+            idxs = get_classifier()(batch).argmax(dim=1).tolist()
+        card_preds = [_CLASS_LABELS[i] for i in idxs
+                      if _CLASS_LABELS[i] != "joker"]   # ignore jokers
+
+    if show:                                   # notebook debugging only
+        from IPython.display import display
+        display(Image.fromarray(rgb).resize((400, round(400*H/W))))
         print("Detected:", card_preds)
 
     return card_preds
@@ -110,7 +159,7 @@ def predict_cards(image_path:str, show=False):
 # ------------------------------------------------------------
 # 3. End-to-end wrapper
 # ------------------------------------------------------------
-def run_hand_analysis(image_path:str,
+def run_hand_analysis(image,
                       hole_input:str,
                       num_players:int,
                       call_amt:float,
@@ -118,9 +167,10 @@ def run_hand_analysis(image_path:str,
                       cfg:DecisionConfiguration=DecisionConfiguration()):
     """
     Full pipeline → returns dict summarising everything.
+    `image` is a BGR ndarray (e.g. from cv2.imdecode), a PIL.Image or a path.
     """
     # Detect + classify boards
-    board_human = predict_cards(image_path)
+    board_human = predict_cards(image)
     board_human = [c for c in board_human if c != "joker"]
     board_treys = [convert_to_treys_format(c) for c in board_human]
 
@@ -128,17 +178,22 @@ def run_hand_analysis(image_path:str,
     hole_human = [c.strip().lower() for c in hole_input.replace(" and ",",").split(",")]
     hole_treys = [convert_to_treys_format(c) for c in hole_human]
 
-    # Validation to prevent Treys from crashing (Treys checks 5-7 cards)
+    # Validation (the evaluator needs 5-7 cards)
     if len(board_treys) < 3:
         raise ValueError(f"Only detected {len(board_treys)} community cards "
                          "(need at least 3 for flop).")
     if len(hole_treys) != 2:
         raise ValueError("Hole-card input must contain exactly two cards "
                          "like 'ten of clubs, ace of diamonds'.")
-    # Treys evaluation
-    evaluator=Evaluator()
-    score = evaluator.evaluate([Card.new(c) for c in board_treys],
-                               [Card.new(c) for c in hole_treys])
+    # Rank/suit bitmasks (and a real deck) count each card once
+    seen = hole_treys + board_treys
+    dupes = sorted({c for c in seen if seen.count(c) > 1})
+    if dupes:
+        raise ValueError(f"Card(s) {', '.join(dupes)} appear more than once "
+                         "across the board and hole cards; each card can "
+                         "appear only once.")
+    # Hand evaluation (Treys-scale score)
+    score = evaluate_hand(hole_treys, board_treys)
 
     pot_odds = call_amt/(pot_before+call_amt) if (pot_before+call_amt) else 0.0
 
@@ -2,15 +2,16 @@
 Poker logic helpers:
   • String ↔ Treys conversion
   • Flush / straight draw detection
+  • Hand evaluation (Cactus Kev lookup tables, Treys-compatible scores)
   • Board-texture analysis
   • DecisionConfiguration + decide_action()
 
-Imports ONLY pure-Python + treys; no heavy CV libraries here.
+Imports ONLY pure-Python; no heavy CV libraries here.
 """
 
-from collections import Counter
-from dataclasses import dataclass
-from treys import Card, Evaluator
+from dataclasses import dataclass, field
+from itertools import combinations
+from math import ceil, isfinite
 
 # ------------------------------------------------------------
 # 1. Treys-conversion helpers
@@ -24,6 +25,29 @@ _RANK_FROM_WORD = {
 }
 _SUIT_FROM_WORD = {'clubs':'c','diamonds':'d','hearts':'h','spades':'s'}
 
+# Every canonical spelling ('ten of clubs', '10 of clubs', '6 of hearts')
+# → Treys string, so the common case is a single dict probe.
+_CARD_DIRECT = {
+    f"{word} of {suit_word}": rank+suit
+    for word, rank in (list(_RANK_FROM_WORD.items()) +
+                       [(d, d) for d in '23456789'] + [('10', 'T')])
+    for suit_word, suit in _SUIT_FROM_WORD.items()
+}
+
+# Cards as bitmasks: bit r (2..14) per rank, one rank mask per suit.
+# A repeated card sets the same bit twice, so helpers assume distinct cards
+# (run_hand_analysis rejects duplicates).
+_SUIT_IDX = {'c':0,'d':1,'h':2,'s':3}
+
+# Rank value / suit index by ord(char), either case, so the hot helpers
+# below skip .upper()/.lower() and dict hashing.
+_RANK_BY_ORD = [0]*128
+_SUIT_BY_ORD = [0]*128
+for _r, _v in _RANK_ORDER.items():
+    _RANK_BY_ORD[ord(_r)] = _RANK_BY_ORD[ord(_r.lower())] = _v
+for _s, _i in _SUIT_IDX.items():
+    _SUIT_BY_ORD[ord(_s)] = _SUIT_BY_ORD[ord(_s.upper())] = _i
+
 def convert_to_treys_format(card_name: str) -> str:
     """
     'ten of clubs'  → 'Tc'
@@ -34,6 +58,11 @@ def convert_to_treys_format(card_name: str) -> str:
     and returns Treys format ('6h').
     """
     card_name = card_name.lower().strip()
+    card = _CARD_DIRECT.get(card_name)
+    return card if card is not None else _parse_card_name(card_name)
+
+def _parse_card_name(card_name: str) -> str:
+    # Slow path: odd spacing around "of", or a bad name → helpful ValueError
     parts = card_name.split(" of ")
     if len(parts) != 2:
         raise ValueError(f"Invalid card name format. Please write like so (e.g. six of clubs, queen of spades): {card_name}")
@@ -62,56 +91,137 @@ def convert_to_treys_format(card_name: str) -> str:
 
 
 def _rank_val(card:str) -> int:
-    return _RANK_ORDER[card[0].upper()]
+    return _RANK_BY_ORD[ord(card[0])]
 
-def _suit_char(card:str) -> str:
-    return card[-1].lower()
+def _suit_idx(card:str) -> int:
+    return _SUIT_BY_ORD[ord(card[-1])]
+
+def _rank_mask(cards) -> int:
+    m = 0
+    for c in cards:
+        m |= 1 << _RANK_BY_ORD[ord(c[0])]
+    return m
+
+def _suit_masks(cards) -> list:
+    masks = [0]*4
+    for c in cards:
+        masks[_SUIT_BY_ORD[ord(c[-1])]] |= 1 << _RANK_BY_ORD[ord(c[0])]
+    return masks
+
+def _with_wheel(rank_mask:int) -> int:
+    """Copy the ace (bit 14) down to bit 1 so A-2-3-4-5 reads as a run."""
+    return rank_mask | ((rank_mask >> 13) & 2)
 
 # ------------------------------------------------------------
 # 2. Flush & straight draw helpers
 # ------------------------------------------------------------
 def has_flush_draw(hole, board, need=4):
-    suits = [_suit_char(c) for c in hole+board]
-    return any(v >= need for v in Counter(suits).values())
+    return any(m.bit_count() >= need for m in _suit_masks(hole+board))
 
 def made_flush(hole, board):
     return has_flush_draw(hole, board, need=5)
 
-def _unique_sorted_ranks_with_wheel(cards):
-    ranks = {_rank_val(c) for c in cards}
-    if 14 in ranks: 
-        ranks.add(1)  # Ace low
-    return sorted(ranks)
+# What a 5-rank window (bit i = rank low+i) holds:
+# all five → made; four with an end missing → open-ended; four with
+# both ends held → gutshot.
+_MADE, _OPEN, _GUT = 1, 2, 4
+_WINDOW_FLAGS = tuple(
+    _MADE if w == 0x1F else
+    (_GUT if w & 0x11 == 0x11 else _OPEN) if w.bit_count() == 4 else 0
+    for w in range(32))
 
 def has_straight_draw(hole, board):
-    cards = hole+board
-    ranks = _unique_sorted_ranks_with_wheel(cards)
-    if len(ranks) < 4:
-        return {'open_ended':False,'gutshot':False,'made_straight':False,'any_draw':False}
-
-    open_ended = gutshot = made = False
-    rset = set(ranks)
+    m = _with_wheel(_rank_mask(hole+board))
+    flags = 0
     for low in range(1,11):
-        want = {low+i for i in range(5)}
-        have = want & rset
-        miss = 5 - len(have)
-        if miss == 0:
-            made = True
-        elif miss == 1:
-            sorted_have = sorted(have)
-            if max(have) - min(have) == 4:
-                gutshot = True
-            else:
-                consec = sorted_have[-1]-sorted_have[0]==3 and len(sorted_have)==4
-                if consec: 
-                    open_ended = True
-                else: 
-                    gutshot = True
+        flags |= _WINDOW_FLAGS[(m >> low) & 0x1F]
+    made, open_ended, gutshot = bool(flags & _MADE), bool(flags & _OPEN), bool(flags & _GUT)
     return {'open_ended':open_ended,'gutshot':gutshot,
-            'made_straight':made,'any_draw':made or open_ended or gutshot}
+            'made_straight':made,'any_draw':flags != 0}
+
+# ------------------------------------------------------------
+# 3. Hand evaluation
+# ------------------------------------------------------------
+# Cactus Kev's evaluator, built once at import. Cards are 32-bit ints
+#   xxxbbbbb bbbbbbbb cdhsrrrr xxpppppp
+# (b = rank bit, cdhs = suit bit, r = rank 0-12, p = rank prime), i.e. the
+# same layout as treys.Card, and scores use the Treys scale:
+# 1 = royal flush … 7462 = 7-5-4-3-2 offsuit.
+_PRIMES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+_SUIT_BIT = (8, 4, 2, 1)     # cdhs, indexed like _SUIT_IDX
+
+_MAX_STRAIGHT_FLUSH = 10
+_MAX_FOUR_OF_A_KIND = 166
+_MAX_FULL_HOUSE     = 322
+_MAX_FLUSH          = 1599
+_MAX_STRAIGHT       = 1609
+_MAX_THREE_OF_A_KIND= 2467
+_MAX_TWO_PAIR       = 3325
+_MAX_PAIR           = 6185
+
+def _card_int(card:str) -> int:
+    r = _rank_val(card) - 2
+    return (1 << (16+r)) | (_SUIT_BIT[_suit_idx(card)] << 12) | (r << 8) | _PRIMES[r]
+
+def _build_tables():
+    # rank bitmasks of the 10 straights, best (A-high) to worst (wheel)
+    straights = [0x1F << i for i in range(8, -1, -1)] + [0x100F]
+    # every other 5-distinct-rank pattern, best to worst
+    others = sorted((sum(1 << r for r in c) for c in combinations(range(13), 5)
+                     if sum(1 << r for r in c) not in straights), reverse=True)
+
+    flush = [0]*(0x1F00+1)      # indexed by OR of rank bits, suited
+    unique5 = [0]*(0x1F00+1)    # same, offsuit (straights + high cards)
+    for i, bits in enumerate(straights):
+        flush[bits] = 1 + i
+        unique5[bits] = _MAX_FLUSH + 1 + i
+    for i, bits in enumerate(others):
+        flush[bits] = _MAX_FULL_HOUSE + 1 + i
+        unique5[bits] = _MAX_PAIR + 1 + i
+
+    # hands with a repeated rank, keyed by prime product
+    products = {}
+    desc = range(12, -1, -1)
+    p = _PRIMES
+    def fill(rank, prods):
+        for prod in prods:
+            products[prod] = rank; rank += 1
+    fill(_MAX_STRAIGHT_FLUSH+1, (p[q]**4 * p[k] for q in desc for k in desc if k != q))
+    fill(_MAX_FOUR_OF_A_KIND+1, (p[t]**3 * p[pr]**2 for t in desc for pr in desc if pr != t))
+    fill(_MAX_STRAIGHT+1, (p[t]**3 * p[a]*p[b] for t in desc
+                           for a, b in combinations([k for k in desc if k != t], 2)))
+    fill(_MAX_THREE_OF_A_KIND+1, (p[a]**2 * p[b]**2 * p[k] for a, b in combinations(desc, 2)
+                                  for k in desc if k not in (a, b)))
+    fill(_MAX_TWO_PAIR+1, (p[pr]**2 * p[a]*p[b]*p[c] for pr in desc
+                           for a, b, c in combinations([k for k in desc if k != pr], 3)))
+    return flush, unique5, products
+
+_FLUSH_RANK, _UNIQUE5_RANK, _PRODUCT_RANK = _build_tables()
+_FIVE_OF = {n: tuple(combinations(range(n), 5)) for n in (5, 6, 7)}
+# Treys string → card int for the whole deck; the ints never change.
+_CARD_INT = {r+s: _card_int(r+s) for r in _RANK_ORDER for s in _SUIT_IDX}
+
+def _eval5(c1, c2, c3, c4, c5) -> int:
+    if c1 & c2 & c3 & c4 & c5 & 0xF000:
+        return _FLUSH_RANK[(c1 | c2 | c3 | c4 | c5) >> 16]
+    rank = _UNIQUE5_RANK[(c1 | c2 | c3 | c4 | c5) >> 16]
+    if rank:
+        return rank
+    return _PRODUCT_RANK[(c1 & 0xFF) * (c2 & 0xFF) * (c3 & 0xFF) * (c4 & 0xFF) * (c5 & 0xFF)]
+
+def evaluate_hand(hole, board) -> int:
+    """
+    Best 5-card score from hole+board (5-7 cards in Treys format),
+    on the Treys scale: lower is stronger.
+    """
+    cards = [_CARD_INT[c] for c in hole+board]
+    if len(cards) not in _FIVE_OF:
+        raise ValueError(f"Need 5-7 cards to evaluate a hand, got {len(cards)}")
+    return min(_eval5(cards[a], cards[b], cards[c], cards[d], cards[e])
+               for a, b, c, d, e in _FIVE_OF[len(cards)])
 
 # ------------------------------------------------------------
-# 3. Board texture
+# 4. Board texture
 # ------------------------------------------------------------
 @dataclass
 class BoardTexture:
@@ -125,23 +235,29 @@ def get_game_stage(board):
 
 def analyze_board_texture(board):
     stage=get_game_stage(board)
-    suits=[_suit_char(c) for c in board]
-    suit_cnt=Counter(suits)
-    monotone=len(suit_cnt)==1
-    two_tone=len(suit_cnt)==2
-    rainbow=len(suit_cnt)>=3
-    ranks=sorted((_rank_val(c) for c in board),reverse=True)
-    rank_cnt=Counter(ranks)
-    paired=any(v>=2 for v in rank_cnt.values())
-    trips_or_better=any(v>=3 for v in rank_cnt.values())
-    uniq=_unique_sorted_ranks_with_wheel(board)
-    straighty=len(uniq)>=3 and max(uniq)-min(uniq)<=4
+    # one pass: overall + per-suit rank masks
+    rank_mask=0; suit_masks=[0]*4; ranks=[]
+    for c in board:
+        r=_rank_val(c); bit=1<<r
+        rank_mask|=bit; suit_masks[_suit_idx(c)]|=bit; ranks.append(r)
+    ranks.sort(reverse=True)
+
+    n_suits=(suit_masks[0]!=0)+(suit_masks[1]!=0)+(suit_masks[2]!=0)+(suit_masks[3]!=0)
+    monotone=n_suits==1
+    two_tone=n_suits==2
+    rainbow=n_suits>=3
+    paired=rank_mask.bit_count()<len(board)
+    c,d,h,sp=suit_masks
+    trips_or_better=bool((c&d&(h|sp)) | (h&sp&(c|d)))   # a rank in ≥3 suits
+    uniq=_with_wheel(rank_mask)
+    straighty=(uniq.bit_count()>=3 and
+               uniq.bit_length()-(uniq & -uniq).bit_length()<=4)
     return BoardTexture(stage,paired,trips_or_better,monotone,two_tone,rainbow,
-                        straighty,max(ranks) if ranks else None,
-                        min(ranks) if ranks else None,ranks)
+                        straighty,rank_mask.bit_length()-1 if ranks else None,
+                        (rank_mask & -rank_mask).bit_length()-1 if ranks else None,ranks)
 
 # ------------------------------------------------------------
-# 4. Decision engine
+# 5. Decision engine
 # ------------------------------------------------------------
 @dataclass
 class DecisionConfiguration:
@@ -155,20 +271,100 @@ class DecisionConfiguration:
     draw_loosen_mult:float=0.85
     monster_loosen_mult:float=0.7
     texture_tighten_mult:float=1.15
+    # (stage, num_players, monster, draw, tighten) → score thresholds;
+    # filled lazily, so treat the config as read-only once it is in use.
+    _threshold_cache:dict=field(default_factory=dict,init=False,repr=False,compare=False)
+    _fold_cache:dict=field(default_factory=dict,init=False,repr=False,compare=False)
     def __post_init__(self):
         if self.stage_mult is None:
             self.stage_mult={'pre-flop':1.3,'flop':1.2,'turn':1.0,'river':0.8}
 
+    def base_factors(self, stage:str, num_players:int):
+        """(stage_factor, player_factor) for a clamped player count."""
+        frac=(num_players-2)/(self.max_players-2) if self.max_players>2 else 0.0
+        return self.stage_mult.get(stage,1.0), 1.0+self.player_tighten_strength*frac
+
+    def score_thresholds(self, stage:str, num_players:int,
+                         monster:bool, draw:bool, tighten:bool):
+        """
+        Returns (factor, raise_thr, monster_thr, call_thr): the total
+        multiplier applied to hand_score, and the raise / monster / call
+        cut-offs moved onto the raw (integer) Treys score, i.e. the
+        smallest score whose adjusted value is no longer below each base.
+        The cut-offs are None when the factor is not a finite positive
+        number (score and adjusted score no longer move together);
+        decide_action then compares the adjusted score directly.
+        """
+        key=(stage,num_players,monster,draw,tighten)
+        thr=self._threshold_cache.get(key)
+        if thr is None:
+            mults=list(self.base_factors(stage, num_players))
+            if monster: mults.append(self.monster_loosen_mult)
+            if draw:    mults.append(self.draw_loosen_mult)
+            if tighten: mults.append(self.texture_tighten_mult)
+
+            def adjusted(score):
+                for m in mults:
+                    score*=m
+                return score
+
+            def cutoff(base):
+                # base/factor, nudged so float rounding matches adjusted()
+                k=ceil(base/factor)
+                while adjusted(k-1)>=base: k-=1
+                while adjusted(k)<base:    k+=1
+                return k
+
+            factor=adjusted(1.0)
+            bases=(self.base_raise_score, 0.5*self.base_raise_score,
+                   self.base_call_score)
+            if factor>0 and all(isfinite(b/factor) for b in bases):
+                thr=(factor, *map(cutoff, bases))
+            else:
+                thr=(factor, None, None, None)
+            self._threshold_cache[key]=thr
+        return thr
+
+    def fold_cutoff(self, stage:str, num_players:int, draw_possible:bool,
+                    exp_raise:bool, exp_call:bool):
+        """
+        Raw score at/above which decide_action folds whatever the draws
+        and board texture turn out to be (max over every monster / draw /
+        tighten combination of the loosest live raise-or-call cut-off).
+        inf (never short-circuit) if any combination has no cut-offs.
+        """
+        key=(stage,num_players,draw_possible,exp_raise,exp_call)
+        cut=self._fold_cache.get(key)
+        if cut is None:
+            cut=0
+            for monster in (False, True):
+                for draw in {False, draw_possible}:
+                    for tighten in (False, True):
+                        _, raise_thr, monster_thr, call_thr = self.score_thresholds(
+                            stage, num_players, monster, draw, tighten)
+                        if raise_thr is None:      # max() keeps inf from here on
+                            cut=float('inf')
+                            continue
+                        cut=max(cut,
+                                min(raise_thr,monster_thr) if exp_raise else raise_thr,
+                                min(call_thr,monster_thr) if exp_call else call_thr)
+            self._fold_cache[key]=cut
+        return cut
+
 def decide_action(hand_score:int,num_players:int,hole,board,pot_odds:float,
                   cfg:DecisionConfiguration=DecisionConfiguration(),
                   return_explanation=False):
-    # Stage & player factor
     stage=get_game_stage(board)
-    stage_factor=cfg.stage_mult.get(stage,1.0)
     num_players=max(2,min(num_players,cfg.max_players))
-    frac=(num_players-2)/(cfg.max_players-2) if cfg.max_players>2 else 0.0
-    player_factor=1.0+cfg.player_tighten_strength*frac
-    adjusted=hand_score*stage_factor*player_factor
+    exp_call  = pot_odds>=cfg.pot_odds_call_cap
+    exp_raise = pot_odds>=cfg.pot_odds_raise_cap
+
+    # Hopeless score: fold before paying for draw / texture analysis
+    # (the explanation needs those, so only when none is requested).
+    if not return_explanation:
+        draw_possible = stage in ('flop','turn') and pot_odds<=cfg.pot_odds_call_cap
+        if hand_score>=cfg.fold_cutoff(stage,num_players,draw_possible,exp_raise,exp_call):
+            return 'fold'
 
     # Draws & board texture
     fd = has_flush_draw(hole,board,4)
@@ -177,46 +373,56 @@ def decide_action(hand_score:int,num_players:int,hole,board,pot_odds:float,
     made_s = sd['made_straight']
     bt = analyze_board_texture(board)
 
-    if made_f or made_s:
-        adjusted*=cfg.monster_loosen_mult
-    if stage in ('flop','turn') and (fd or sd['any_draw']) and pot_odds<=cfg.pot_odds_call_cap:
-        adjusted*=cfg.draw_loosen_mult
+    made_monster = made_f or made_s
+    draw_loosen = (stage in ('flop','turn') and (fd or sd['any_draw'])
+                   and pot_odds<=cfg.pot_odds_call_cap)
 
     # tighten for scary board we don't hit
     tighten=False
+    hole_ranks, board_ranks = _rank_mask(hole), _rank_mask(board)
     if bt.paired:
-        if {_rank_val(c) for c in hole}.isdisjoint({_rank_val(c) for c in board}):
+        if not hole_ranks & board_ranks:
             tighten=True
     if bt.monotone and not tighten:
-        b_suit={_suit_char(c) for c in board}
-        if not any(_suit_char(c) in b_suit for c in hole):
+        board_suits=[m!=0 for m in _suit_masks(board)]
+        if not any(board_suits[_suit_idx(c)] for c in hole):
             tighten=True
     if bt.straighty and not tighten:
-        hv=sorted({_rank_val(c) for c in hole})
-        br=sorted({_rank_val(c) for c in board})
-        if hv and (hv[-1]<br[0]-1 and hv[0]>br[-1]+1):
+        # highest / lowest rank = top / bottom set bit
+        h_hi, h_lo = hole_ranks.bit_length()-1, (hole_ranks & -hole_ranks).bit_length()-1
+        b_hi, b_lo = board_ranks.bit_length()-1, (board_ranks & -board_ranks).bit_length()-1
+        if hole_ranks and (h_hi<b_lo-1 and h_lo>b_hi+1):
             tighten=True
-    if tighten:
-        adjusted*=cfg.texture_tighten_mult
 
-    exp_call  = pot_odds>=cfg.pot_odds_call_cap
-    exp_raise = pot_odds>=cfg.pot_odds_raise_cap
-    monster   = adjusted<0.5*cfg.base_raise_score
+    # adjusted = hand_score*factor < base  ⇔  hand_score < base/factor
+    factor, raise_thr, monster_thr, call_thr = cfg.score_thresholds(
+        stage, num_players, made_monster, draw_loosen, tighten)
 
-    if adjusted<cfg.base_raise_score and not exp_raise:
-        action='raise'
-    elif adjusted<cfg.base_raise_score and exp_raise and monster:
+    if raise_thr is not None:
+        below_raise, below_call = hand_score<raise_thr, hand_score<call_thr
+        monster = hand_score<monster_thr
+    else:
+        # zero / negative / non-finite multiplier: apply it step by step
+        stage_factor, player_factor = cfg.base_factors(stage, num_players)
+        adjusted=hand_score*stage_factor*player_factor
+        if made_monster: adjusted*=cfg.monster_loosen_mult
+        if draw_loosen:  adjusted*=cfg.draw_loosen_mult
+        if tighten:      adjusted*=cfg.texture_tighten_mult
+        below_raise = adjusted<cfg.base_raise_score
+        below_call  = adjusted<cfg.base_call_score
+        monster     = adjusted<0.5*cfg.base_raise_score
+
+    if below_raise and (not exp_raise or monster):
         action='raise'
-    elif adjusted<cfg.base_call_score and not exp_call:
-        action='call'
-    elif adjusted<cfg.base_call_score and exp_call and monster:
+    elif below_call and (not exp_call or monster):
         action='call'
     else:
         action='fold'
 
     if return_explanation:
+        stage_factor, player_factor = cfg.base_factors(stage, num_players)
         return action, dict(stage=stage,player_factor=player_factor,
                             stage_factor=stage_factor,flush_draw=fd,
                             straight_info=sd,board_texture=bt,
-                            adjusted_score=adjusted,action=action)
+                            adjusted_score=hand_score*factor,action=action)
     return action